@@ -1,6 +1,11 @@
+import asyncio
+import logging
 import os
+import queue
+import sys
 import tempfile
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from typing import Annotated
 
 from dotenv import load_dotenv
@@ -12,6 +17,23 @@ from transcription import TranscriptionService
 
 load_dotenv()
 
+# Request handlers only enqueue log records; a background thread writes them out
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+logging.basicConfig(format="%(message)s", handlers=[QueueHandler(log_queue)])
+# Only our own loggers print INFO; libraries (httpx, faster_whisper) stay at WARNING
+for name in (__name__, "transcription"):
+    logging.getLogger(name).setLevel(logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Each Whisper run holds a full batched pipeline in memory; cap how many run at once
+whisper_concurrency = os.getenv("WHISPER_CONCURRENCY", "1").strip()
+if not whisper_concurrency.isdigit():
+    raise ValueError(
+        f"WHISPER_CONCURRENCY must be a positive integer, got {whisper_concurrency!r}"
+    )
+whisper_slots = asyncio.Semaphore(max(1, int(whisper_concurrency)))  # 0 would hang
+
 
 class CleanRequest(BaseModel):
     text: str
@@ -25,16 +47,23 @@ service = None
 async def lifespan(app: FastAPI):
     """Uses OpenAI-compatible API (Ollama, OpenAI, LM Studio, etc.). Configure via .env file."""
     global service
-    print("🚀 Starting AI Transcript App...")
+    log_listener.start()
+    try:
+        logger.info("🚀 Starting AI Transcript App...")
 
-    service = TranscriptionService(
-        whisper_model=os.getenv("WHISPER_MODEL"),
-        llm_base_url=os.getenv("LLM_BASE_URL"),
-        llm_api_key=os.getenv("LLM_API_KEY"),
-        llm_model=os.getenv("LLM_MODEL"),
-    )
-    print("✅ Ready!")
-    yield
+        service = TranscriptionService(
+            whisper_model=os.getenv("WHISPER_MODEL"),
+            llm_base_url=os.getenv("LLM_BASE_URL"),
+            llm_api_key=os.getenv("LLM_API_KEY"),
+            llm_model=os.getenv("LLM_MODEL"),
+        )
+        await service.check_llm_connection()
+        logger.info("✅ Ready!")
+        yield
+        await service.close()
+    finally:
+        # Flush queued records, including any from a failed startup/shutdown
+        log_listener.stop()
 
 
 app = FastAPI(title="AI Transcript App", lifespan=lifespan)
@@ -84,11 +113,13 @@ async def transcribe_audio(audio: Annotated[UploadFile, File()]):
         tmp_path = tmp.name
 
     try:
-        raw_text = service.transcribe(tmp_path)
+        # Whisper is CPU/GPU-bound, so keep it off the event loop
+        async with whisper_slots:
+            raw_text = await asyncio.to_thread(service.transcribe, tmp_path)
         return {"success": True, "text": raw_text}
 
     except Exception as e:
-        print(f"❌ Transcription error: {e}")
+        logger.error("❌ Transcription error: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Transcription failed: {str(e)}"
         ) from e
@@ -105,11 +136,11 @@ async def clean_text(request: CleanRequest):
         raise HTTPException(status_code=503, detail="Service not ready")
 
     try:
-        cleaned_text = service.clean_with_llm(
+        cleaned_text = await service.clean_with_llm(
             request.text, system_prompt=request.system_prompt
         )
         return {"success": True, "text": cleaned_text}
 
     except Exception as e:
-        print(f"❌ LLM cleaning error: {e}")
+        logger.error("❌ LLM cleaning error: %s", e)
         raise HTTPException(status_code=500, detail=f"Cleaning failed: {str(e)}") from e
@@ -4,14 +4,15 @@ Uses OpenAI API format, compatible with Ollama, OpenAI, LM Studio, and other pro
 Configuration is loaded from .env file.
 """
 
+import asyncio
+import logging
 from pathlib import Path
 
-from faster_whisper import WhisperModel
-from openai import OpenAI
-
 # Edit system_prompt.txt to change how the LLM cleans transcriptions
 PROMPT_FILE = Path(__file__).parent / "system_prompt.txt"
-SYSTEM_PROMPT = PROMPT_FILE.read_text().strip()
+SYSTEM_PROMPT = PROMPT_FILE.read_bytes().decode("utf-8").strip()
+
+logger = logging.getLogger(__name__)
 
 
 class TranscriptionService:
@@ -20,50 +21,81 @@ class TranscriptionService:
     def __init__(
         self, whisper_model: str, llm_base_url: str, llm_api_key: str, llm_model: str
     ):
-        print(f"🔄 Loading Whisper model '{whisper_model}'...")
+        # Heavy imports (CTranslate2, OpenAI SDK) are deferred so importing
+        # this module stays cheap until the service is actually built
+        import ctranslate2
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
+        from openai import AsyncOpenAI
+
+        logger.info("🔄 Loading Whisper model '%s'...", whisper_model)
+        # float16 needs compute capability 7.0+; older GPUs (e.g. Pascal) reject it
+        compute_type = "int8"
+        if ctranslate2.get_cuda_device_count() > 0:
+            cuda_types = ctranslate2.get_supported_compute_types("cuda")
+            if "float16" in cuda_types:
+                compute_type = "float16"
+            elif "int8_float16" in cuda_types:
+                compute_type = "int8_float16"
         self.whisper = WhisperModel(
             whisper_model,
             device="auto",  # Auto-detect: Metal (Mac), CUDA (NVIDIA), or CPU
-            compute_type="int8",
+            compute_type=compute_type,
         )
-        print(f"✅ Whisper model '{whisper_model}' loaded!")
+        # Batches 30s windows through the encoder instead of one at a time
+        self.pipeline = BatchedInferencePipeline(model=self.whisper)
+        logger.info("✅ Whisper model '%s' loaded!", whisper_model)
 
-        print(f"🔄 Connecting to LLM at {llm_base_url}...")
-        self.llm_client = OpenAI(base_url=llm_base_url, api_key=llm_api_key)
+        self.llm_base_url = llm_base_url
+        self.llm_api_key = llm_api_key
+        self.llm_client = AsyncOpenAI(base_url=llm_base_url, api_key=llm_api_key)
         self.llm_model = llm_model
 
+    async def check_llm_connection(self):
+        logger.info("🔄 Connecting to LLM at %s...", self.llm_base_url)
         try:
-            self.llm_client.models.list()
-            print("✅ Connected to LLM API!")
+            await self.llm_client.models.list()
+            logger.info("✅ Connected to LLM API!")
         except Exception as e:
-            print(f"⚠️  Warning: Could not connect to LLM: {e}")
-            print(f"   Make sure your LLM server is running at {llm_base_url}")
+            logger.warning("⚠️  Warning: Could not connect to LLM: %s", e)
+            logger.warning(
+                "   Make sure your LLM server is running at %s", self.llm_base_url
+            )
 
-    def transcribe(self, audio_file):
-        print("🔄 Transcribing...")
+    async def close(self):
+        # Release the LLM client's connection pool on shutdown
+        await self.llm_client.close()
 
-        segments, info = self.whisper.transcribe(
-            audio_file, beam_size=5, language="en", condition_on_previous_text=False
+    def transcribe(self, audio_file):
+        logger.info("🔄 Transcribing...")
+
+        # Batched mode never conditions on previous text
+        segments, info = self.pipeline.transcribe(
+            audio_file,
+            batch_size=16,
+            beam_size=5,
+            language="en",
+            vad_filter=True,  # Skip silent stretches before decoding
         )
 
-        text = " ".join([segment.text for segment in segments]).strip()
-        print(f"📝 Raw: {text}")
+        text = " ".join(segment.text for segment in segments).strip()
+        logger.info("📝 Raw: %s", text)
         return text
 
     def get_default_system_prompt(self):
         return SYSTEM_PROMPT
 
-    def clean_with_llm(self, text, system_prompt=None):
+    async def clean_with_llm(self, text, system_prompt=None, llm_client=None):
         if not text:
             return ""
 
         # Use custom prompt or fall back to default
         prompt_to_use = system_prompt if system_prompt else SYSTEM_PROMPT
+        llm_client = llm_client or self.llm_client
 
-        print("🤖 Cleaning with LLM...")
+        logger.info("🤖 Cleaning with LLM...")
 
         try:
-            response = self.llm_client.chat.completions.create(
+            response = await llm_client.chat.completions.create(
                 model=self.llm_model,
                 messages=[
                     {"role": "system", "content": prompt_to_use},
@@ -74,22 +106,41 @@ class TranscriptionService:
             )
 
             cleaned = response.choices[0].message.content.strip()
-            print(f"✨ Cleaned: {cleaned}")
+            logger.info("✨ Cleaned: %s", cleaned)
             return cleaned
 
         except Exception as e:
-            print(f"⚠️  LLM error: {e}")
+            logger.warning("⚠️  LLM error: %s", e)
             return text  # Fallback to raw text
 
-    def transcribe_file(self, audio_file_path: str, use_llm: bool = True) -> dict:
-        raw_text = self.transcribe(audio_file_path)
+    async def transcribe_file(
+        self, audio_file_path: str, use_llm: bool = True, llm_client=None
+    ) -> dict:
+        # Whisper is CPU/GPU-bound, so keep it off the event loop
+        raw_text = await asyncio.to_thread(self.transcribe, audio_file_path)
 
         result = {"raw_text": raw_text}
 
         if use_llm and raw_text:
-            cleaned_text = self.clean_with_llm(raw_text)
+            cleaned_text = await self.clean_with_llm(raw_text, llm_client=llm_client)
             result["cleaned_text"] = cleaned_text
         else:
             result["cleaned_text"] = raw_text
 
         return result
+
+    def transcribe_file_sync(self, audio_file_path: str, use_llm: bool = True) -> dict:
+        """Blocking wrapper for callers without a running event loop."""
+        from openai import AsyncOpenAI
+
+        async def run():
+            # self.llm_client's pool is bound to the server's loop, so asyncio.run
+            # gets a client that lives and dies with its own loop
+            async with AsyncOpenAI(
+                base_url=self.llm_base_url, api_key=self.llm_api_key
+            ) as llm_client:
+                return await self.transcribe_file(
+                    audio_file_path, use_llm=use_llm, llm_client=llm_client
+                )
+
+        return asyncio.run(run())